@@ -0,0 +1,111 @@
+"""
+Bottleneck courses of the prerequisite graph. For every course, reports
+- unlocks: the number of courses that directly require it
+- transitive: the number of courses that require it, directly or not
+- betweenness: its betweenness centrality on the prerequisite graph
+- longest: the number of longest prerequisite chains that pass through it
+"""
+import argparse, csv, json, os, sys
+from array import array
+import catalog
+import course as cs
+import csr
+
+FIELDS = ["course", "title", "unlocks", "transitive", "betweenness", "longest"]
+
+def transitive(graph: csr.Graph, order: array = None) -> list:
+    """ Number of descendants of every node of a DAG, with the reachable
+        sets kept as bitsets and merged in reverse topological order. """
+    order = graph.topological() if order is None else order
+    reach = [0]*len(graph)
+    for u in reversed(order):
+        for v in graph.neighbors(u):
+            reach[u] |= reach[v] | (1 << v)
+    return [bin(bits).count("1") for bits in reach]
+
+def longest(graph: csr.Graph, order: array = None) -> list:
+    """ Number of longest paths of a DAG that pass through every node. """
+    order = graph.topological() if order is None else order
+    n, parents = len(graph), graph.transpose()
+    # length and number of the longest paths ending and starting at a node
+    up, up_count = csr.zeros(n), [1]*n
+    down, down_count = csr.zeros(n), [1]*n
+    for u in order:
+        for v in parents.neighbors(u):
+            if up[v] + 1 > up[u]:
+                up[u], up_count[u] = up[v] + 1, up_count[v]
+            elif up[v] + 1 == up[u]:
+                up_count[u] += up_count[v]
+    for u in reversed(order):
+        for v in graph.neighbors(u):
+            if down[v] + 1 > down[u]:
+                down[u], down_count[u] = down[v] + 1, down_count[v]
+            elif down[v] + 1 == down[u]:
+                down_count[u] += down_count[v]
+    length = max(up, default=0)
+    return [up_count[u]*down_count[u] if up[u] + down[u] == length else 0
+            for u in range(n)]
+
+def analyze(graph: csr.Graph, course_data: dict) -> list:
+    """ Computes every statistic for every course in the graph. """
+    order = graph.topological()
+    rows = zip(graph.nodes, graph.degree(), transitive(graph, order),
+               graph.betweenness(), longest(graph, order))
+    return [{"course": course,
+             "title": course_data.get(course, {}).get("title", "???"),
+             "unlocks": unlocks,
+             "transitive": reach,
+             "betweenness": round(centrality, 6),
+             "longest": paths,
+            }
+            for course, unlocks, reach, centrality, paths in rows]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bottleneck course analytics")
+    parser.add_argument("-v", "--version", action="version", version="1.0")
+    parser.add_argument("-d", "--data", required=True,
+                        help="course data JSON file or SQLite catalog")
+    parser.add_argument("-c", "--course", help="course list text file")
+    parser.add_argument("-p", "--prune", help="prune courses text file")
+    parser.add_argument("-u", "--undergrad", action="store_true",
+                        help="ignore prerequisites of graduate courses")
+    parser.add_argument("-f", "--format", choices=["csv", "json"],
+                        default="csv", help="output format")
+    parser.add_argument("-s", "--sort", choices=FIELDS[2:],
+                        default="betweenness", help="column to sort by")
+    parser.add_argument("-n", "--top", type=int,
+                        help="number of courses to report")
+    parser.add_argument("-o", "--output", help="output file, stdout if unset")
+
+    args = parser.parse_args()
+
+    courses = None if args.course is None else cs.load_file(args.course)
+    course_prune = set(cs.load_file(args.prune))
+    course_data, _ = catalog.load_data(args.data, courses)
+    if courses is None:
+        courses = sorted(course_data.keys())
+
+    trees = {cid: cs.parse_prereq(course_data[cid]["prereqs"], course_prune)
+             for cid in courses}
+    assert all(map(cs.is_simple, trees.values())), "trees are not simple"
+
+    rows = analyze(cs.build_graph(courses, trees, args.undergrad), course_data)
+    rows.sort(key=lambda row: (-row[args.sort], row["course"]))
+    rows = rows[:args.top]
+
+    if args.output is None:
+        f = sys.stdout
+    else:
+        directory = os.path.dirname(args.output)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        f = open(args.output, "w")
+    if args.format == "csv":
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        json.dump(rows, f, indent=4)
+        f.write("\n")
+    if f is not sys.stdout:
+        f.close()
@@ -0,0 +1,189 @@
+"""
+An optional SQLite-backed course catalog, an alternative to data/courses.json.
+Each course is a row holding its JSON record, alongside indexed columns for
+the department, level and category so that readers only load the slice they
+render. The courses each prerequisite string mentions are precomputed into an
+edge table, and writers upsert one course per transaction.
+"""
+import argparse, json, os, pathlib, re, sqlite3
+import course as cs
+
+# default course category, as in graph.py
+DEFAULT = "Miscellaneous"
+# course mentioned in an OSCAR prerequisite string, see course.to_course
+PREREQ = re.compile(r"level (\S+) (\S+) Minimum Grade")
+# maximum number of parameters bound in a single query
+CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    code       TEXT PRIMARY KEY,
+    department TEXT NOT NULL,
+    undergrad  INTEGER NOT NULL,
+    category   TEXT NOT NULL,
+    data       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS courses_department ON courses (department);
+CREATE INDEX IF NOT EXISTS courses_undergrad ON courses (undergrad);
+CREATE INDEX IF NOT EXISTS courses_category ON courses (category);
+CREATE TABLE IF NOT EXISTS prereqs (
+    course TEXT NOT NULL REFERENCES courses (code) ON DELETE CASCADE,
+    prereq TEXT NOT NULL,
+    PRIMARY KEY (course, prereq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS prereqs_prereq ON prereqs (prereq);
+"""
+
+def is_catalog(fname: str) -> bool:
+    """ Whether the file name refers to a SQLite catalog. """
+    return fname.endswith((".db", ".sqlite", ".sqlite3"))
+
+def connect(fname: str) -> sqlite3.Connection:
+    """ Opens the catalog for writing, creating it if it doesn't exist. """
+    conn = sqlite3.connect(fname)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+def open_catalog(fname: str) -> sqlite3.Connection:
+    """ Opens an existing catalog read-only. """
+    if not os.path.isfile(fname):
+        raise FileNotFoundError(f"no such catalog: '{fname}'")
+    uri = pathlib.Path(fname).resolve().as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+def prereqs(s: str) -> list:
+    """ Returns every course mentioned in a prerequisite string. """
+    return sorted(set(" ".join(match) for match in PREREQ.findall(s)))
+
+def write(conn: sqlite3.Connection, course: str, data: dict) -> None:
+    """ Inserts or replaces a course without committing. """
+    department, cid = course.split()
+    conn.execute(
+        "INSERT INTO courses VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (code) DO UPDATE SET department = excluded.department, "
+        "undergrad = excluded.undergrad, category = excluded.category, "
+        "data = excluded.data",
+        (course, department, cs.Course(department, cid).undergrad,
+         data.get("category", DEFAULT), json.dumps(data, sort_keys=True)))
+    conn.execute("DELETE FROM prereqs WHERE course = ?", (course,))
+    conn.executemany("INSERT INTO prereqs VALUES (?, ?)",
+                     ((course, prereq)
+                      for prereq in prereqs(data.get("prereqs", ""))))
+
+def upsert(conn: sqlite3.Connection, course: str, data: dict) -> None:
+    """ Inserts or replaces a single course in its own transaction. """
+    with conn:
+        write(conn, course, data)
+
+def update(conn: sqlite3.Connection, courses: dict) -> None:
+    """ Inserts or replaces many courses in one transaction. """
+    with conn:
+        for course in sorted(courses):
+            write(conn, course, courses[course])
+
+def chunks(items: list) -> list:
+    """ Splits a list into pieces small enough to bind as parameters. """
+    return [items[i: i + CHUNK] for i in range(0, len(items), CHUNK)]
+
+def load(conn: sqlite3.Connection, courses: list = None,
+         departments: list = None, undergrad: bool = None,
+         category: str = None) -> dict:
+    """ Loads the courses matching every given filter into a dictionary
+        with the same layout as data/courses.json. """
+    where, params = [], []
+    if departments is not None:
+        where.append(f"department IN ({', '.join('?'*len(departments))})")
+        params += departments
+    if undergrad is not None:
+        where.append("undergrad = ?")
+        params.append(int(undergrad))
+    if category is not None:
+        where.append("category = ?")
+        params.append(category)
+
+    query = "SELECT code, data FROM courses"
+    if courses is None:
+        groups = [[]]
+    else:
+        groups = chunks(list(courses))
+        where.append("code IN ({})")
+    if len(where) > 0:
+        query += " WHERE " + " AND ".join(where)
+
+    course_data = {}
+    for group in groups:
+        rows = conn.execute(query.format(", ".join("?"*len(group))),
+                            params + group)
+        course_data.update((code, json.loads(data)) for code, data in rows)
+    return course_data
+
+def load_data(fname: str, courses: list = None) -> tuple:
+    """ Loads the course data and the sorted list of every category from a
+        catalog or JSON file. A catalog only loads the given courses. """
+    if is_catalog(fname):
+        conn = open_catalog(fname)
+        course_data = load(conn, courses)
+        names = categories(conn)
+        conn.close()
+    else:
+        with open(fname) as f:
+            course_data = json.load(f)
+        names = sorted(set(data.get("category", DEFAULT)
+                           for data in course_data.values()))
+    return course_data, names
+
+def categories(conn: sqlite3.Connection) -> list:
+    """ Returns every category in the catalog, in sorted order. """
+    return [category for category, in conn.execute(
+        "SELECT DISTINCT category FROM courses ORDER BY category")]
+
+def neighborhood(conn: sqlite3.Connection, courses: list,
+                 up: int = None, down: int = None) -> list:
+    """ Returns the catalog courses within up levels of prerequisites and
+        down levels of dependents of the given courses (unbounded if None),
+        following the precomputed prerequisite edges level by level. """
+    queries = [
+        (up, "SELECT DISTINCT p.prereq FROM prereqs p "
+             "JOIN courses c ON c.code = p.prereq WHERE p.course IN ({})"),
+        (down, "SELECT DISTINCT course FROM prereqs WHERE prereq IN ({})"),
+    ]
+    starts, result = set(load(conn, courses)), set()
+    for depth, query in queries:
+        seen, level = set(starts), 0
+        frontier = sorted(seen)
+        while len(frontier) > 0 and (depth is None or level < depth):
+            level += 1
+            found = set()
+            for group in chunks(frontier):
+                found.update(code for code, in conn.execute(
+                    query.format(", ".join("?"*len(group))), group))
+            frontier = sorted(found - seen)
+            seen |= found
+        result |= seen
+    return sorted(result)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite course catalog")
+    parser.add_argument("-v", "--version", action="version", version="1.0")
+    parser.add_argument("source", help="course data JSON file or catalog")
+    parser.add_argument("target", help="course data JSON file or catalog")
+
+    args = parser.parse_args()
+
+    # convert between the JSON file and the catalog in either direction
+    if is_catalog(args.source):
+        conn = open_catalog(args.source)
+        courses = load(conn)
+        conn.close()
+    else:
+        with open(args.source) as f:
+            courses = json.load(f)
+
+    if is_catalog(args.target):
+        conn = connect(args.target)
+        update(conn, courses)
+        conn.close()
+    else:
+        with open(args.target, "w") as f:
+            json.dump(courses, f, indent=4, sort_keys=True)
@@ -1,5 +1,6 @@
 import argparse
 from typing import Union
+import csr
 import parse
 
 
@@ -75,6 +76,25 @@ def parse_prereq(s: str, course_prune: list) -> Term:
     """ Parses the prerequisite string into a Term tree. """
     return prune(Term(course_prune, parse.parse(s))) if len(s) != 0 else None
 
+def build_graph(courses: list, trees: dict,
+                undergrad: bool = False) -> csr.Graph:
+    """ Builds the prerequisite graph, where node A points to node B
+        if B has A as a prerequisite. """
+    edges, members = [], set(courses)
+    for course in sorted(courses):
+        # skip graduate courses
+        if undergrad and not Course(*course.split()).undergrad:
+            continue
+        for child in (trees[course] if trees[course] is not None else []):
+            if str(child) in members:
+                edges.append((str(child), course))
+    return csr.Graph(courses, edges)
+
+def is_simple(tree: Term) -> bool:
+    """ Whether the tree is depth 1 with and conditions. """
+    return tree is None or (tree.op == "and" and \
+        all(isinstance(child, Course) for child in tree))
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Course prerequisite parser")
     parser.add_argument("-v", "--version", action="version", version="1.0")
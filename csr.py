@@ -0,0 +1,210 @@
+"""
+A compact directed graph over integer node ids.
+Edges are stored in compressed sparse row (CSR) form: the out-neighbors of
+node u are targets[offsets[u]: offsets[u + 1]]. Both buffers are flat
+machine-integer arrays, so a catalog with thousands of courses costs a few
+bytes per edge instead of a Python list (and a duplicated undirected copy)
+per course. Node labels are kept on the side and mapped to ids once.
+"""
+from array import array
+
+# typecode of every integer buffer
+INT = "l"
+
+def zeros(n: int) -> array:
+    """ Returns an integer array of n zeros. """
+    return array(INT, bytes(n*array(INT).itemsize))
+
+
+class UnionFind:
+
+    """ Disjoint sets over the integers 0, ..., n - 1. """
+
+    def __init__(self, n: int) -> None:
+        self.parent = array(INT, range(n))
+        self.size = array(INT, [1])*n
+
+    def find(self, u: int) -> int:
+        """ Returns the representative of u's set, halving the path. """
+        parent = self.parent
+        while parent[u] != u:
+            parent[u] = parent[parent[u]]
+            u = parent[u]
+        return u
+
+    def union(self, u: int, v: int) -> int:
+        """ Merges the sets of u and v by size, returning the new root. """
+        u, v = self.find(u), self.find(v)
+        if u == v:
+            return u
+        if self.size[u] < self.size[v]:
+            u, v = v, u
+        self.parent[v] = u
+        self.size[u] += self.size[v]
+        return u
+
+
+class Graph:
+
+    """ Directed graph in compressed sparse row form. """
+
+    def __init__(self, nodes: list, edges: list) -> None:
+        """ Builds the graph from node labels and (source, target) labels.
+            Out-neighbors keep the order their edges were given in. """
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        n, m = len(self.nodes), len(edges)
+
+        sources, targets = zeros(m), zeros(m)
+        offsets = zeros(n + 1)
+        for i, (u, v) in enumerate(edges):
+            u, v = self.index[u], self.index[v]
+            sources[i], targets[i] = u, v
+            offsets[u + 1] += 1
+        for u in range(n):
+            offsets[u + 1] += offsets[u]
+
+        # counting sort of the edges by source, stable in the input order
+        cursor = offsets[:-1]
+        self.targets = zeros(m)
+        for u, v in zip(sources, targets):
+            self.targets[cursor[u]] = v
+            cursor[u] += 1
+        self.offsets = offsets
+
+    @classmethod
+    def from_csr(cls, nodes: list, offsets: array, targets: array) -> "Graph":
+        """ Wraps existing CSR buffers without copying them. """
+        graph = cls.__new__(cls)
+        graph.nodes = list(nodes)
+        graph.index = {node: i for i, node in enumerate(graph.nodes)}
+        graph.offsets, graph.targets = offsets, targets
+        return graph
+
+    def __len__(self) -> int:
+        """ Number of nodes. """
+        return len(self.nodes)
+
+    def edges(self) -> int:
+        """ Number of edges. """
+        return len(self.targets)
+
+    def neighbors(self, u: int) -> array:
+        """ Out-neighbors of the node u. """
+        return self.targets[self.offsets[u]: self.offsets[u + 1]]
+
+    def degree(self) -> array:
+        """ Out-degree of every node. """
+        offsets = self.offsets
+        return array(INT, (offsets[u + 1] - offsets[u]
+                           for u in range(len(self))))
+
+    def indegree(self) -> array:
+        """ In-degree of every node. """
+        count = zeros(len(self))
+        for v in self.targets:
+            count[v] += 1
+        return count
+
+    def transpose(self) -> "Graph":
+        """ Returns the graph with every edge reversed. """
+        n, offsets = len(self), zeros(len(self) + 1)
+        for v in self.targets:
+            offsets[v + 1] += 1
+        for u in range(n):
+            offsets[u + 1] += offsets[u]
+        cursor, targets = offsets[:-1], zeros(self.edges())
+        for u in range(n):
+            for v in self.neighbors(u):
+                targets[cursor[v]] = u
+                cursor[v] += 1
+        return Graph.from_csr(self.nodes, offsets, targets)
+
+    def components(self) -> tuple:
+        """ Labels the weakly connected components, numbered in order
+            of their first node. Returns the labels and the count. """
+        n, sets = len(self), UnionFind(len(self))
+        for u in range(n):
+            for v in self.neighbors(u):
+                sets.union(u, v)
+        ids, label = array(INT, [-1])*n, zeros(n)
+        index = 0
+        for u in range(n):
+            root = sets.find(u)
+            if ids[root] == -1:
+                ids[root] = index
+                index += 1
+            label[u] = ids[root]
+        return label, index
+
+    def bfs(self, starts: list, depth: int = None) -> array:
+        """ Breadth-first-search from every start node, stopping after
+            depth levels (unbounded if None). Returns the distance to
+            each node, with -1 for nodes that were not reached. """
+        dist = array(INT, [-1])*len(self)
+        frontier = list(starts)
+        for node in frontier:
+            dist[node] = 0
+        level = 0
+        while len(frontier) > 0 and (depth is None or level < depth):
+            level += 1
+            queue = []
+            for node in frontier:
+                for child in self.neighbors(node):
+                    if dist[child] == -1:
+                        dist[child] = level
+                        queue.append(child)
+            frontier = queue
+        return dist
+
+    def topological(self) -> array:
+        """ Orders the nodes so every edge points forward (Kahn's algorithm).
+            Raises ValueError if the graph has a cycle. """
+        count, order = self.indegree(), zeros(len(self))
+        head = tail = 0
+        for u in range(len(self)):
+            if count[u] == 0:
+                order[tail] = u
+                tail += 1
+        while head < tail:
+            u = order[head]
+            head += 1
+            for v in self.neighbors(u):
+                count[v] -= 1
+                if count[v] == 0:
+                    order[tail] = v
+                    tail += 1
+        if tail != len(self):
+            raise ValueError("graph has a cycle")
+        return order
+
+    def betweenness(self) -> array:
+        """ Betweenness centrality of every node with Brandes' algorithm.
+            Dependencies are accumulated over successors in reverse
+            breadth-first order, so no predecessor lists are stored, and
+            the flat buffers are reset only where each search touched. """
+        n = len(self)
+        centrality = array("d", bytes(8*n))
+        sigma, delta = array("d", bytes(8*n)), array("d", bytes(8*n))
+        dist = array(INT, [-1])*n
+        for s in range(n):
+            sigma[s], dist[s] = 1, 0
+            order, i = [s], 0
+            while i < len(order):
+                v = order[i]
+                i += 1
+                for w in self.neighbors(v):
+                    if dist[w] == -1:
+                        dist[w] = dist[v] + 1
+                        order.append(w)
+                    if dist[w] == dist[v] + 1:
+                        sigma[w] += sigma[v]
+            for w in reversed(order):
+                for x in self.neighbors(w):
+                    if dist[x] == dist[w] + 1:
+                        delta[w] += sigma[w]/sigma[x]*(1 + delta[x])
+                if w != s:
+                    centrality[w] += delta[w]
+            for v in order:
+                sigma[v], delta[v], dist[v] = 0, 0, -1
+        return centrality
@@ -1,9 +1,13 @@
 import argparse, os, json
+import catalog
 import course as cs
+import csr
 import far
 
 # default course category
 DEFAULT = "Miscellaneous"
+# prefix of the node id of a cluster of courses
+CLUSTER = "cluster:"
 # taken from https://www.cc.gatech.edu/threads-better-way-learn-computing
 COLOR_LIST = [
     (  2, 112, 112), # devices
@@ -45,47 +49,8 @@ COLOR_LIST = ["rgba({}, {}, {}, 0.8)".format(*pastel(color))
               for color in COLOR_LIST]
 COLOR_LIST[4] = "rgba(240, 240, 240, 0.8)"
 
-### graph functions
-
-def dfs(graph: dict, start: str) -> dict:
-    """ Depth-first-search to find the distance between nodes. """
-    seen = {start: 0}
-    stk = [start]
-    while len(stk) > 0:
-        node = stk.pop()
-        for child in graph[node]:
-            if child not in seen:
-                seen[child] = seen[node] + 1
-                stk.append(child)
-    return seen
-
-def assign(graph: dict, start: str, index: int, ids: dict) -> None:
-    """ Assigns every reachable node from start to the component index. """
-    stk = [start]
-    ids[start] = index
-    while len(stk) > 0:
-        node = stk.pop()
-        for child in graph[node]:
-            if child not in ids:
-                ids[child] = index
-                stk.append(child)
-
-def connected(graph: dict) -> tuple:
-    """ Finds the connected components of an undirected graph. """
-    ids, index = {}, 0
-    for node in graph:
-        if node not in ids:
-            assign(graph, node, index, ids)
-            index += 1
-    return ids, index
-
 ### helper methods
 
-def is_simple(tree: cs.Term) -> bool:
-    """ Whether the tree is depth 1 with and conditions. """
-    return tree is None or (tree.op == "and" and \
-        all(isinstance(child, cs.Course) for child in tree))
-
 def color(course: str) -> str:
     """ Gets the color of a course. """
     # default color
@@ -104,6 +69,25 @@ def category(course: str) -> str:
     """ Returns the color category of a course. """
     return palette[course_data[course].get("category", DEFAULT)]
 
+def cluster(course: str) -> str:
+    """ Returns the node id of the cluster containing the course. """
+    name = course.split()[0] if args.cluster == "department" else \
+        course_data[course].get("category", DEFAULT)
+    return CLUSTER + name
+
+def node(course: str) -> dict:
+    """ Returns the vis-network options of a course's node. """
+    colors = {"background": color(course)}
+    if args.color:
+        colors["border"] = category(course)
+        colors["background"] = category(course)
+    return {"title": description(course),
+            "label": course_data[course]["title"],
+            "shape": "box",
+            "color": colors,
+            # "borderWidth": 2,
+           }
+
 def header(course: str) -> str:
     """ Returns a header summary for the course. """
     title = course_data.get(course, {}).get("title", "???")
@@ -151,11 +135,86 @@ def patch(fname: str) -> None:
         for line in [line + "\n" for line in header.splitlines()] + lines[10:]:
             f.write(line)
 
+def expand(fname: str, clusters: dict, courses: dict) -> None:
+    """ Add a script to the generated html file that expands a cluster
+        node into its courses and their precomputed edges on click. """
+    data = lambda x: json.dumps(x, sort_keys=True).replace("</", "<\\/")
+    script = \
+"""
+<script type="text/javascript">
+// cluster node ids to courses, courses to their node and neighbors by cluster
+var clusters = %s;
+var courses = %s;
+var expanded = {};
+
+function link(from, to, count) {
+    // single course edge, or an aggregated edge to or from a cluster
+    var edge = {from: from, to: to};
+    if (from in clusters || to in clusters) {
+        edge.value = count;
+        edge.label = String(count);
+        edge.title = count + " edges";
+    }
+    return edge;
+}
+
+network.on("click", function (params) {
+    var id = params.nodes.length === 1 ? params.nodes[0] : null;
+    if (!(id in clusters) || expanded[id]) {
+        return;
+    }
+    var position = network.getPosition(id);
+    expanded[id] = true;
+    edges.remove(network.getConnectedEdges(id));
+    nodes.remove(id);
+
+    var added = [];
+    clusters[id].forEach(function (course) {
+        var node = Object.assign({id: course}, courses[course].node);
+        node.x = position.x;
+        node.y = position.y;
+        nodes.add(node);
+        // edges within the cluster are added once, from their source
+        var out = courses[course].out, into = courses[course].in;
+        Object.keys(out).forEach(function (other) {
+            if (expanded[other]) {
+                out[other].forEach(function (child) {
+                    added.push(link(course, child, 1));
+                });
+            } else {
+                added.push(link(course, other, out[other].length));
+            }
+        });
+        Object.keys(into).forEach(function (other) {
+            if (other === id) {
+                return;
+            }
+            if (expanded[other]) {
+                into[other].forEach(function (parent) {
+                    added.push(link(parent, course, 1));
+                });
+            } else {
+                added.push(link(other, course, into[other].length));
+            }
+        });
+    });
+    edges.add(added);
+});
+</script>
+</body>
+""".strip() % (data(clusters), data(courses))
+
+    with open(fname) as f:
+        html = f.read()
+
+    with open(fname, "w") as f:
+        f.write(html.replace("</body>", script + "\n", 1))
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Course prerequisite graph")
     parser.add_argument("-v", "--version", action="version", version="1.0")
     parser.add_argument("-d", "--data", required=True,
-                        help="course data JSON file")
+                        help="course data JSON file or SQLite catalog")
     parser.add_argument("-c", "--course", help="course list text file")
     parser.add_argument("-p", "--prune", help="prune courses text file")
     parser.add_argument("-t", "--taken", help="taken courses text file")
@@ -165,82 +224,130 @@ if __name__ == "__main__":
                         help="only show undergraduate courses")
     parser.add_argument("-C", "--color", action="store_true",
                         help="color code based on cateogry")
+    parser.add_argument("-f", "--focus", action="append",
+                        help="only show the neighborhood of this course")
+    parser.add_argument("--up", type=int,
+                        help="prerequisite depth to show around --focus")
+    parser.add_argument("--down", type=int,
+                        help="dependent depth to show around --focus")
+    parser.add_argument("-g", "--cluster",
+                        choices=["department", "category"],
+                        help="collapse courses into clusters expanded on click")
     parser.add_argument("-s", "--seed", type=int, help="random seed")
     parser.add_argument("-o", "--options", help="options JSON file")
 
     args = parser.parse_args()
 
-    with open(args.data) as f:
-        course_data = json.load(f)
-
-    # map category name to color
-    if args.color:
-        categories = sorted(set(data.get("category", DEFAULT)
-                                for data in course_data.values()))
-        palette = dict(zip(categories, COLOR_LIST))
+    for name, depth in (("--up", args.up), ("--down", args.down)):
+        if depth is not None and depth < 0:
+            parser.error(f"{name} must be non-negative, got {depth}")
 
     # load course list, prune list, and taken classes
-    courses = sorted(course_data.keys()) if args.course is None else \
-        cs.load_file(args.course)
+    courses = None if args.course is None else cs.load_file(args.course)
     course_prune = set(cs.load_file(args.prune))
     taken = set(cs.load_file(args.taken))
 
+    # a catalog only needs the neighborhood of the focus courses
+    if courses is None and args.focus is not None and \
+            catalog.is_catalog(args.data):
+        conn = catalog.open_catalog(args.data)
+        courses = catalog.neighborhood(conn, args.focus, args.up, args.down)
+        conn.close()
+    course_data, categories = catalog.load_data(args.data, courses)
+    if courses is None:
+        courses = sorted(course_data.keys())
+
+    # map category name to color
+    if args.color:
+        palette = dict(zip(categories, COLOR_LIST))
+
     # generate prerequisite trees for each course
     trees = {}
     for cid in sorted(courses):
         trees[cid] = cs.parse_prereq(course_data[cid]["prereqs"], course_prune)
         # print(f"{header(cid)} {trees[cid]}")
 
-    assert all(map(is_simple, trees.values())), "trees are not simple"
+    assert all(map(cs.is_simple, trees.values())), "trees are not simple"
 
     ### generating and visualizing graph
 
     from pyvis.network import Network
 
-    # node A points to node B if B has A as a prerequisite 
-    graph = {course: [] for course in courses}
-    undirected = {course: [] for course in courses}
-    for course in sorted(courses):
-        # skip graduate courses
-        if args.undergrad and not cs.Course(*course.split()).undergrad:
-            continue
-        for child in (trees[course] if trees[course] is not None else []):
-            if child in courses:
-                graph[child].append(course)
-                undirected[child].append(course)
-                undirected[course].append(child)
-
-    # generate connected components of underlying undirected graph
-    ids, index = connected(undirected)
-    comps = {i: [] for i in range(index)}
-    for key, value in ids.items():
-        comps[value].append(key)
-    # take only the k largest components
-    order = sorted(comps,
-                   key=lambda i: len(comps[i]), reverse=True)[:args.components]
-    courses = [str(course) for i in order for course in comps[i]]
-    render = set(courses)
+    graph = cs.build_graph(courses, trees, args.undergrad)
+    members = set(courses)
+
+    if args.focus is not None:
+        # ego graph: ancestors and descendants within the given depths
+        missing = [course for course in args.focus if course not in members]
+        if len(missing) > 0:
+            parser.error(f"focus courses not in course list: {missing}")
+        starts = [graph.index[course] for course in args.focus]
+        up = graph.transpose().bfs(starts, args.up)
+        down = graph.bfs(starts, args.down)
+        nodes = [u for u in range(len(graph)) if up[u] != -1 or down[u] != -1]
+    else:
+        # generate weakly connected components with union-find
+        ids, index = graph.components()
+        sizes = csr.zeros(index)
+        for i in ids:
+            sizes[i] += 1
+        # take only the k largest components
+        order = sorted(range(index),
+                       key=lambda i: sizes[i], reverse=True)[:args.components]
+        rank = {i: r for r, i in enumerate(order)}
+        nodes = sorted((u for u in range(len(graph)) if ids[u] in rank),
+                       key=lambda u: rank[ids[u]])
+    courses = [graph.nodes[u] for u in nodes]
+    render = set(nodes)
 
     # make pyvis network
     net = Network(directed=True, width="2560px", height="1440px")
 
-    for course in courses:
-        colors = {"background": color(course)}
-        if args.color:
-            colors["border"] = category(course)
-            colors["background"] = category(course)
-        net.add_node(course,
-                     title=description(course),
-                     label=course_data[course]["title"],
-                     shape="box",
-                     color=colors,
-                     # borderWidth=2,
-                    )
-
-    for node in graph:
-        for child in graph[node]:
-            if node in render and child in render:
-                net.add_edge(node, child)
+    if args.cluster is None:
+        for course in courses:
+            net.add_node(course, **node(course))
+
+        for u in nodes:
+            for v in graph.neighbors(u):
+                if v in render:
+                    net.add_edge(graph.nodes[u], graph.nodes[v])
+    else:
+        # group courses and their neighbors by cluster ahead of time
+        clusters = {}
+        data = {course: {"node": node(course), "out": {}, "in": {}}
+                for course in courses}
+        for course in courses:
+            clusters.setdefault(cluster(course), []).append(course)
+        weights = {}
+        for u in nodes:
+            for v in graph.neighbors(u):
+                if v in render:
+                    a, b = graph.nodes[u], graph.nodes[v]
+                    data[a]["out"].setdefault(cluster(b), []).append(b)
+                    data[b]["in"].setdefault(cluster(a), []).append(a)
+                    if cluster(a) != cluster(b):
+                        key = (cluster(a), cluster(b))
+                        weights[key] = weights.get(key, 0) + 1
+
+        # draw only summary nodes and aggregated edges between them
+        for name in sorted(clusters):
+            label = name[len(CLUSTER):]
+            colors = palette[label] if args.color and \
+                args.cluster == "category" else "rgba(240, 240, 240, 0.8)"
+            net.add_node(name,
+                         title="\n".join(clusters[name]),
+                         label=f"{label}\n{len(clusters[name])} courses",
+                         shape="box",
+                         color=colors,
+                         borderWidth=2,
+                        )
+
+        for (a, b), weight in sorted(weights.items()):
+            net.add_edge(a, b,
+                         value=weight,
+                         label=str(weight),
+                         title=f"{weight} edges",
+                        )
 
     # create legend
     # not sure how to do this without affecting the resulting graph
@@ -293,28 +400,5 @@ var options = {
         os.mkdir("output")
     net.show(out)
     patch(out)
-
-    ### counting prerequisites
-
-    count = {}
-    for tree in trees.values():
-        for child in (tree if tree is not None else []):
-            count[child] = count.get(child, 0) + 1
-
-    # for course in sorted(count, key=count.get, reverse=True)[:20]:
-    #     print(f"{header(course)} {count[course]}")
-
-    ### deepest path in graph
-
-    deepest, length = None, -1
-    for course in graph:
-        dist = dfs(graph, course)
-        depth = max(dist.values())
-        if depth > length:
-            deepest, length = course, depth
-
-    # print(f"{deepest} ->")
-    # for course, dist in sorted(dfs(graph, deepest).items(),
-    #                            key=lambda x: x[1]):
-    #     print(f"-> {header(course)}, {dist}")
-
+    if args.cluster is not None:
+        expand(out, clusters, data)
@@ -1,7 +1,10 @@
 import sys, os, json
+# allow importing modules from the repository root
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import catalog
 
-# file path to write final json file
-OUT = "data/courses.json"
+# file path to write final json file, or a SQLite catalog given as argument
+OUT = sys.argv[1] if len(sys.argv) > 1 else "data/courses.json"
 # end of line marker
 END = "© 2021 Ellucian Company L.P. and its affiliates."
 # categories: https://www.cc.gatech.edu/threads-better-way-learn-computing
@@ -49,19 +52,33 @@ def parse_course(lines: list) -> dict:
                     "prereqs": prereqs,
                    }
 
+def save(conn, course: str, data: dict) -> None:
+    """ Upserts a single course if writing to a catalog. """
+    if conn is not None:
+        catalog.upsert(conn, course, data)
+
 if __name__ == "__main__":
+    exists = os.path.exists(OUT)
+    conn = catalog.connect(OUT) if catalog.is_catalog(OUT) else None
     # tag existing parsed data
-    if os.path.exists(OUT):
-        with open(OUT) as f:
-            courses = json.load(f)
+    if exists:
+        if conn is None:
+            with open(OUT) as f:
+                courses = json.load(f)
+        else:
+            courses = catalog.load(conn)
         try:
             for course in sorted(courses):
                 data = courses[course]
+                category = data.get("category")
                 if "category" not in data:
                     data["category"] = \
                         CATEGORIES[get_category(f"{course} {data['title']}")]
                 if isinstance(data["category"], int):
                     data["category"] = CATEGORIES[int(data["category"])]
+                # commit each newly tagged course to the catalog
+                if data["category"] != category:
+                    save(conn, course, data)
         # if KeyboardInterrupt or other exception, write to file
         except:
             pass
@@ -74,8 +91,11 @@ if __name__ == "__main__":
             if line == END:
                 course, data = parse_course(course)
                 courses[course] = data
+                save(conn, course, data)
                 course = []
 
-    with open(OUT, "w") as f:
-        json.dump(courses, f, indent=4, sort_keys=True)
-
+    if conn is None:
+        with open(OUT, "w") as f:
+            json.dump(courses, f, indent=4, sort_keys=True)
+    else:
+        conn.close()
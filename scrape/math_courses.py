@@ -1,9 +1,12 @@
-import json
+import sys, os, json
 import requests
 from requests_html import HTMLSession
+# allow importing modules from the repository root
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import catalog
 
-# file path to write final json file
-OUT = "data/courses.json"
+# file path to write final json file, or a SQLite catalog given as argument
+OUT = sys.argv[1] if len(sys.argv) > 1 else "data/courses.json"
 # URLs to scrape
 URLS = [
     # "https://math.gatech.edu/projected-schedule-of-undergraduate-courses",
@@ -31,8 +34,12 @@ def course_data(session: HTMLSession, url: str) -> dict:
 
 def scrape(url: str) -> None:
     """ Goes through each course on the page. """
-    with open(OUT) as f:
-        courses = json.load(f)
+    if catalog.is_catalog(OUT):
+        conn = catalog.connect(OUT)
+    else:
+        conn = None
+        with open(OUT) as f:
+            courses = json.load(f)
 
     session = HTMLSession()
     r = session.get(url, params={"field_semesters_offered_tid": "All"})
@@ -44,12 +51,18 @@ def scrape(url: str) -> None:
         course = f"MATH {cid}"
         data = course_data(session, url)
         data["offered"] = semesters
-        courses[course] = data
+        # upsert each course as it is scraped
+        if conn is None:
+            courses[course] = data
+        else:
+            catalog.upsert(conn, course, data)
 
-    with open(OUT, "w") as f:
-        json.dump(courses, f, indent=4, sort_keys=True)
+    if conn is None:
+        with open(OUT, "w") as f:
+            json.dump(courses, f, indent=4, sort_keys=True)
+    else:
+        conn.close()
 
 if __name__ == "__main__":
     for url in URLS:
         scrape(url)
-
@@ -0,0 +1,147 @@
+"""
+Search-as-you-type over the course catalog.
+Course codes are kept sorted with whitespace removed, so "CS 13" or "cs13"
+finds every code with that prefix by binary search. Titles and descriptions
+go into an inverted index from words to weighted postings; the last word of a
+query is treated as a prefix and expanded over the sorted vocabulary. Courses
+whose code starts with the query come first, shortest code first, followed by
+the courses containing every word of the query ranked by TF-IDF.
+"""
+import argparse, bisect, json, math, os, re
+import catalog
+
+# weight of a word in the title relative to one in the description
+TITLE = 3
+# score reported for a course whose code starts with the query
+CODE = 1000
+# sorts after every character that appears in a key
+END = "\uffff"
+
+def normalize(code: str) -> str:
+    """ Normalizes a course code or code prefix for comparison. """
+    return "".join(code.split()).upper()
+
+def tokenize(s: str) -> list:
+    """ Splits text into lowercase words. """
+    return re.findall(r"[a-z0-9]+", s.lower())
+
+def prefix(keys: list, start: str) -> tuple:
+    """ Range of the sorted keys that start with the given prefix. """
+    lo = bisect.bisect_left(keys, start)
+    return lo, bisect.bisect_left(keys, start + END, lo)
+
+def index_file(fname: str) -> str:
+    """ Returns the path of the index persisted alongside the course data. """
+    return fname + ".index.json"
+
+
+class Index:
+
+    """ Prefix index over course codes and inverted index over text. """
+
+    def __init__(self, course_data: dict) -> None:
+        self.titles = {course: data.get("title", "???")
+                       for course, data in course_data.items()}
+        # word to the courses containing it and its total weight in each
+        self.postings = {}
+        for course, data in sorted(course_data.items()):
+            for weight, field in ((TITLE, "title"), (1, "description")):
+                for word in tokenize(data.get(field, "")):
+                    posting = self.postings.setdefault(word, {})
+                    posting[course] = posting.get(course, 0) + weight
+        self.sort()
+
+    def sort(self) -> None:
+        """ Builds the sorted code and vocabulary arrays. """
+        codes = sorted((normalize(course), course) for course in self.titles)
+        self.keys = [key for key, _ in codes]
+        self.codes = [course for _, course in codes]
+        self.vocab = sorted(self.postings)
+
+    def to_dict(self) -> dict:
+        """ Returns a JSON-serializable form of the index. """
+        return {"titles": self.titles, "postings": self.postings}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Index":
+        """ Restores an index from the output of to_dict. """
+        index = cls.__new__(cls)
+        index.titles, index.postings = data["titles"], data["postings"]
+        index.sort()
+        return index
+
+    def courses(self, code: str) -> list:
+        """ Courses whose code starts with the given code prefix. """
+        lo, hi = prefix(self.keys, normalize(code))
+        return self.codes[lo: hi]
+
+    def complete(self, word: str) -> list:
+        """ Words in the vocabulary that start with the given prefix. """
+        lo, hi = prefix(self.vocab, word)
+        return self.vocab[lo: hi]
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """ Returns the (course, score) pairs best matching the query. """
+        # code matches by length, so an exact match precedes its variants
+        key = normalize(query)
+        codes = [] if len(key) == 0 else \
+            sorted(self.courses(key), key=lambda c: (len(normalize(c)), c))
+
+        # every word must match, the last one possibly as a prefix
+        words, matches = tokenize(query), None
+        n = len(self.titles)
+        for i, word in enumerate(words):
+            expanded = self.complete(word) if i == len(words) - 1 else \
+                [word] if word in self.postings else []
+            found = {}
+            for term in expanded:
+                idf = math.log(1 + n/len(self.postings[term]))
+                for course, weight in self.postings[term].items():
+                    found[course] = found.get(course, 0) + weight*idf
+            matches = found if matches is None else \
+                {course: score + found[course]
+                 for course, score in matches.items() if course in found}
+
+        hits = set(codes)
+        text = sorted(((course, score)
+                       for course, score in (matches or {}).items()
+                       if course not in hits), key=lambda x: (-x[1], x[0]))
+        return ([(course, CODE) for course in codes] + text)[:limit]
+
+def save(index: Index, fname: str) -> None:
+    """ Writes the index to a JSON file. """
+    with open(fname, "w") as f:
+        json.dump(index.to_dict(), f, sort_keys=True)
+
+def load(fname: str) -> Index:
+    """ Reads an index written by save. """
+    with open(fname) as f:
+        return Index.from_dict(json.load(f))
+
+def load_index(data: str, rebuild: bool = False) -> Index:
+    """ Loads the index persisted alongside the course data file, building
+        and saving it first if it is missing or older than the data. """
+    fname = index_file(data)
+    if not rebuild and os.path.exists(fname) and \
+            os.path.getmtime(fname) >= os.path.getmtime(data):
+        return load(fname)
+    index = Index(catalog.load_data(data)[0])
+    save(index, fname)
+    return index
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Course search")
+    parser.add_argument("-v", "--version", action="version", version="1.0")
+    parser.add_argument("-d", "--data", required=True,
+                        help="course data JSON file or SQLite catalog")
+    parser.add_argument("-n", "--limit", type=int, default=10,
+                        help="number of results to show")
+    parser.add_argument("-r", "--rebuild", action="store_true",
+                        help="rebuild the persisted index")
+    parser.add_argument("query", nargs="*", help="course code or words")
+
+    args = parser.parse_args()
+
+    index = load_index(args.data, args.rebuild)
+    for course, score in index.search(" ".join(args.query), args.limit):
+        print(f"{course:9} - {index.titles[course]:25} {score:8.2f}")